@@ -25,8 +25,6 @@ import uuid
 import hashlib
 import secrets as _secrets
 from urllib.parse import urlencode
-from typing import List, Dict, Any
-from datetime import datetime
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -42,14 +40,15 @@ if hasattr(st, "secrets"):
     except Exception:
         pass
 
-from langchain_core.messages import AnyMessage, HumanMessage, AIMessage, AIMessageChunk, ToolMessage, SystemMessage
-from langgraph.graph import StateGraph, START, END
-from langgraph.prebuilt import ToolNode, tools_condition
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, ToolMessage
+
+# langgraph imports are deferred into the cached factories below — the package
+# costs hundreds of ms to import and the factories run once per process, so
+# reruns skip that cost entirely.
 
 from src.tools import initialize_tools
-from src.models import EnhancedLLM, ConversationState
-from src.nodes import create_agent_nodes, route_after_supervisor
+from src.models import EnhancedLLM, ConversationState, RunStats, _forced_model
+from src.nodes import create_agent_nodes, route_after_supervisor, route_after_agent
 from src.conversation import ConversationManager
 from src.auth import (
     init_db, login_user, register_user,
@@ -58,6 +57,7 @@ from src.auth import (
     login_or_create_google_user,
 )
 from src.tools import _active_user_id, _active_pdf_names
+from src.semantic_cache import SemanticResponseCache, SEMANTIC_CACHE_AVAILABLE
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -175,6 +175,84 @@ def render_copy_btn(text: str, btn_key: str) -> None:
     """, height=32)
 
 
+# ---------------------------------------------------------------------------
+# Cached resource factories
+# Streamlit reruns this script top-to-bottom on every interaction, so anything
+# expensive (tool wrappers, LLM manager, compiled graph) must be built exactly
+# once per process and shared across reruns. st.cache_resource does exactly
+# that — unlike st.session_state it also survives new browser sessions.
+# ---------------------------------------------------------------------------
+
+@st.cache_resource(show_spinner="Initializing research tools...")
+def _get_tools():
+    return initialize_tools()
+
+
+@st.cache_resource
+def _get_llm_manager() -> EnhancedLLM:
+    return EnhancedLLM()
+
+
+@st.cache_resource
+def _get_memory():
+    """
+    Checkpointer for conversation state.
+
+    Prefers SqliteSaver: checkpoints are written incrementally to disk, so
+    memory stays bounded as threads accumulate and conversations survive a
+    process restart. MemorySaver (process-local, unbounded dict) remains the
+    fallback when langgraph-checkpoint-sqlite isn't installed.
+
+    check_same_thread=False is required because Streamlit serves sessions and
+    LangGraph runs nodes on different threads than the one creating the
+    connection; SqliteSaver serializes writes internally.
+    """
+    try:
+        import sqlite3
+        from pathlib import Path
+        from langgraph.checkpoint.sqlite import SqliteSaver
+        Path("data").mkdir(exist_ok=True)
+        conn = sqlite3.connect("data/checkpoints.db", check_same_thread=False)
+        logger.info("Using SQLite checkpointer at data/checkpoints.db")
+        return SqliteSaver(conn)
+    except ImportError:
+        from langgraph.checkpoint.memory import MemorySaver
+        logger.warning(
+            "langgraph-checkpoint-sqlite not installed — falling back to "
+            "in-memory checkpoints (unbounded, lost on restart)"
+        )
+        return MemorySaver()
+
+
+@st.cache_resource(show_spinner="Initializing Research Intelligence Assistant...")
+def _get_chatbot() -> "StreamlitChatbot":
+    """
+    Build the chatbot (tools + LLM manager + compiled graph) once per process.
+
+    The instance is shared by every logged-in session, so nothing per-user may
+    be written onto it — the sidebar model selection lives in
+    st.session_state and travels to the LLM manager via the _forced_model
+    ContextVar at invoke time.
+    """
+    return StreamlitChatbot()
+
+
+def _reset_chatbot() -> None:
+    """
+    Invalidate all cached resources so the next rerun rebuilds them.
+
+    Deliberately global: called only when a user applies or clears an API key,
+    which mutates process-wide env vars that EnhancedLLM reads at __init__ —
+    every session is on the new credentials either way, so they all need the
+    rebuild. Conversations survive it under the SQLite checkpointer; only the
+    MemorySaver fallback loses in-flight histories.
+    """
+    _get_tools.clear()
+    _get_llm_manager.clear()
+    _get_memory.clear()
+    _get_chatbot.clear()
+
+
 # ---------------------------------------------------------------------------
 # Chatbot class
 # ---------------------------------------------------------------------------
@@ -183,41 +261,31 @@ class StreamlitChatbot:
     """
     Wraps the LangGraph compiled graph and exposes chat/stream interfaces to the UI.
 
-    Stored in st.session_state so it survives Streamlit reruns without rebuilding
-    the graph (which would lose MemorySaver conversation history).
+    Construct via _get_chatbot() — the st.cache_resource factory guarantees the
+    graph (and its MemorySaver history) is built once per process, not per rerun.
     """
 
     def __init__(self):
-        if "chatbot_initialized" not in st.session_state:
-            with st.spinner("Initializing Research Intelligence Assistant..."):
-                self.tools               = initialize_tools()
-                self.llm_manager         = EnhancedLLM()
-                self.conversation_manager = ConversationManager()
-                self.memory              = MemorySaver()
-                self.graph               = self._build_graph()
-                # Re-apply any model the user had selected before the chatbot was rebuilt
-                saved_model = st.session_state.get("selected_model_name")
-                if saved_model:
-                    self.llm_manager.user_forced_model = saved_model
-                st.session_state.chatbot_initialized = True
-                st.session_state.chatbot = self
-        else:
-            chatbot                  = st.session_state.chatbot
-            self.tools               = chatbot.tools
-            self.llm_manager         = chatbot.llm_manager
-            self.conversation_manager = chatbot.conversation_manager
-            self.memory              = chatbot.memory
-            self.graph               = chatbot.graph
-
-    def _build_graph(self) -> StateGraph:
+        self.tools               = _get_tools()
+        self.llm_manager         = _get_llm_manager()
+        self.conversation_manager = ConversationManager()
+        self.memory              = _get_memory()
+        self.graph               = self._build_graph()
+        # Optional — skips the whole graph when a near-duplicate question was
+        # already answered in this thread. None when embeddings aren't installed.
+        self.response_cache      = SemanticResponseCache() if SEMANTIC_CACHE_AVAILABLE else None
+
+    def _build_graph(self):
         """
         Multi-agent LangGraph graph:
           conversation_manager -> supervisor -> research_agent <-> research_tools
                                             -> pdf_agent      <-> pdf_tools
 
         The supervisor is a fast keyword router (no LLM call). Each agent has its
-        own isolated ToolNode so it can only call the tools it was designed for.
+        own isolated tool node so it can only call the tools it was designed for.
         """
+        from langgraph.graph import StateGraph, START, END
+
         (
             supervisor,
             _route,
@@ -247,7 +315,7 @@ class StreamlitChatbot:
         # Research agent ReAct loop
         builder.add_conditional_edges(
             "research_agent",
-            tools_condition,
+            route_after_agent,
             {"tools": "research_tools", "__end__": END},
         )
         builder.add_edge("research_tools", "research_agent")
@@ -255,7 +323,7 @@ class StreamlitChatbot:
         # PDF agent ReAct loop
         builder.add_conditional_edges(
             "pdf_agent",
-            tools_condition,
+            route_after_agent,
             {"tools": "pdf_tools", "__end__": END},
         )
         builder.add_edge("pdf_tools", "pdf_agent")
@@ -269,11 +337,8 @@ class StreamlitChatbot:
             "messages":             messages,
             "conversation_summary": summary,
             "user_context":         state.get("user_context", {}),
-            "tool_results_cache":   state.get("tool_results_cache", {}),
-            "error_count":          state.get("error_count", 0),
-            "last_tool_used":       state.get("last_tool_used", ""),
-            "current_model_used":   state.get("current_model_used", ""),
-            "model_switch_count":   state.get("model_switch_count", 0),
+            "last_human_content":   state.get("last_human_content", ""),
+            "stats":                state.get("stats") or RunStats(),
             "current_agent":        state.get("current_agent", ""),
             "active_pdfs":          state.get("active_pdfs", []),
         }
@@ -282,12 +347,9 @@ class StreamlitChatbot:
         return {
             "messages":             [HumanMessage(content=message)],
             "user_context":         {},
-            "tool_results_cache":   {},
             "conversation_summary": "",
-            "error_count":          0,
-            "last_tool_used":       "",
-            "current_model_used":   "",
-            "model_switch_count":   0,
+            "last_human_content":   message,
+            "stats":                RunStats(),
             "current_agent":        "",
             "active_pdfs":          [],
         }
@@ -295,13 +357,35 @@ class StreamlitChatbot:
     def chat(self, message: str, thread_id: str = "default") -> str:
         """Non-streaming invoke (sidebar example buttons)."""
         try:
+            # Carry this session's sidebar model selection with the request —
+            # the llm_manager singleton is shared across sessions.
+            _forced_model.set(st.session_state.get("selected_model_name"))
+            if self.response_cache:
+                cached = self.response_cache.lookup(message, thread_id)
+                if cached is not None:
+                    return cached
             # 12 allows up to 5 tool calls (1 conv_manager + 2×5 tool cycles + 1 final answer)
             # before the recursion limit triggers. Claude Opus is more thorough than Groq
             # and may call 2-3 tools per query, so 5 was too tight.
             config = {"configurable": {"thread_id": thread_id}, "recursion_limit": 25}
             result = self.graph.invoke(self._initial_state(message), config)
-            ai_msgs = [m for m in result["messages"] if isinstance(m, AIMessage)]
-            return ai_msgs[-1].content if ai_msgs else "I couldn't generate a response. Please try again."
+            # The answer is at (or near) the end — scan backwards instead of
+            # materializing a full filtered list just to take its last element
+            response = next(
+                (m.content for m in reversed(result["messages"])
+                 if isinstance(m, AIMessage) and m.content),
+                None,
+            )
+            if response is None:
+                return "I couldn't generate a response. Please try again."
+            # Same exclusion as the streaming path: the all-models-failed
+            # handler emits a complete AIMessage that must never be replayed.
+            # A final error_count > 0 marks exactly that branch — every
+            # successful LLM node resets the counter to 0.
+            stats = result.get("stats")
+            if self.response_cache and not (stats and stats.error_count):
+                self.response_cache.store(message, response, thread_id)
+            return response
         except Exception as e:
             return f"Error: {e}. Please check your API keys and try again."
 
@@ -322,6 +406,21 @@ class StreamlitChatbot:
         config = {"configurable": {"thread_id": thread_id}, "recursion_limit": 25}
         st.session_state._last_tools_used = []
         _announced_agent = set()   # track which agents we've already announced
+
+        # Carry this session's sidebar model selection with the request — the
+        # llm_manager singleton is shared across sessions.
+        _forced_model.set(st.session_state.get("selected_model_name"))
+
+        # Near-duplicate of an earlier question in this thread? Serve the cached
+        # answer and skip the LLM + tools entirely.
+        if self.response_cache:
+            cached = self.response_cache.lookup(message, thread_id)
+            if cached is not None:
+                yield "*Answered from this conversation's cache (similar question asked earlier).*\n\n"
+                yield cached
+                return
+
+        _streamed_parts: list = []   # accumulated model text for cache storage
         try:
             for chunk, metadata in self.graph.stream(
                 self._initial_state(message), config, stream_mode="messages"
@@ -352,6 +451,7 @@ class StreamlitChatbot:
                         # OpenAI / Groq format: plain string
                         text = content or ""
                     if text:
+                        _streamed_parts.append(text)
                         yield text
 
                 elif isinstance(chunk, AIMessage) and chunk.content:
@@ -366,6 +466,11 @@ class StreamlitChatbot:
                         yield text or str(content)
                     else:
                         yield content
+
+            # Only cache streamed model text — the complete-AIMessage branch above
+            # is the all-models-failed handler, which must never be replayed.
+            if self.response_cache and _streamed_parts:
+                self.response_cache.store(message, "".join(_streamed_parts), thread_id)
         except Exception as e:
             yield f"\n\nError: {e}"
 
@@ -616,8 +721,21 @@ def main():
             )
 
         if st.button("🚪 Logout", use_container_width=True):
+            # Prune this session's checkpoints before dropping the thread_id —
+            # unlike the old MemorySaver, the SQLite checkpointer persists
+            # across restarts, so without this data/checkpoints.db grows with
+            # every session forever. delete_thread is guarded: older
+            # checkpointer versions don't expose it.
+            thread_id = st.session_state.get("thread_id")
+            if thread_id:
+                try:
+                    memory = _get_memory()
+                    if hasattr(memory, "delete_thread"):
+                        memory.delete_thread(thread_id)
+                except Exception as e:
+                    logger.warning("Could not prune checkpoints for thread %s: %s", thread_id, e)
             for k in ("logged_in_user", "google_login",
-                      "chatbot_initialized", "chatbot", "messages", "thread_id",
+                      "messages", "thread_id",
                       "user_anthropic_key", "user_openai_key", "user_groq_key"):
                 st.session_state.pop(k, None)
             st.rerun()
@@ -687,24 +805,13 @@ def main():
                     format_func=lambda i: model_options[i][0],
                     key="model_selector_idx",
                 )
-                chosen_name     = model_options[selected_model_idx][1]
-                chosen_provider = model_options[selected_model_idx][2]
+                chosen_name = model_options[selected_model_idx][1]
 
-                # Persist selection and apply immediately to the running llm_manager
+                # Session-scoped: the llm_manager singleton is shared across
+                # all logged-in users, so the selection is kept here and passed
+                # through the _forced_model ContextVar on each invocation
+                # rather than written onto the shared manager.
                 st.session_state.selected_model_name = chosen_name
-                chatbot_obj = st.session_state.get("chatbot")
-                if chatbot_obj:
-                    chatbot_obj.llm_manager.user_forced_model = chosen_name
-                    # Also update current_config so the sidebar status badge stays in sync
-                    all_cfgs = (
-                        [chatbot_obj.llm_manager.primary_config,
-                         chatbot_obj.llm_manager.secondary_config]
-                        + chatbot_obj.llm_manager.fallback_configs
-                    )
-                    for cfg in all_cfgs:
-                        if cfg.name == chosen_name:
-                            chatbot_obj.llm_manager.current_config = cfg
-                            break
 
         st.markdown("---")
 
@@ -733,14 +840,12 @@ def main():
                 if st.button("Apply", key="apply_anthropic", use_container_width=True):
                     if new_anthropic.strip() != st.session_state.get("user_anthropic_key", ""):
                         st.session_state.user_anthropic_key = new_anthropic.strip()
-                        st.session_state.pop("chatbot_initialized", None)
-                        st.session_state.pop("chatbot", None)
+                        _reset_chatbot()
                     st.rerun()
             with c2:
                 if st.button("Clear", key="remove_anthropic", use_container_width=True):
                     st.session_state.user_anthropic_key = ""
-                    st.session_state.pop("chatbot_initialized", None)
-                    st.session_state.pop("chatbot", None)
+                    _reset_chatbot()
                     st.rerun()
 
         elif "OpenAI" in key_provider:
@@ -755,14 +860,12 @@ def main():
                 if st.button("Apply", key="apply_openai", use_container_width=True):
                     if new_openai.strip() != st.session_state.get("user_openai_key", ""):
                         st.session_state.user_openai_key = new_openai.strip()
-                        st.session_state.pop("chatbot_initialized", None)
-                        st.session_state.pop("chatbot", None)
+                        _reset_chatbot()
                     st.rerun()
             with c2:
                 if st.button("Clear", key="remove_openai", use_container_width=True):
                     st.session_state.user_openai_key = ""
-                    st.session_state.pop("chatbot_initialized", None)
-                    st.session_state.pop("chatbot", None)
+                    _reset_chatbot()
                     st.rerun()
 
         else:  # Groq
@@ -777,14 +880,12 @@ def main():
                 if st.button("Apply", key="apply_groq", use_container_width=True):
                     if new_groq.strip() != st.session_state.get("user_groq_key", ""):
                         st.session_state.user_groq_key = new_groq.strip()
-                        st.session_state.pop("chatbot_initialized", None)
-                        st.session_state.pop("chatbot", None)
+                        _reset_chatbot()
                     st.rerun()
             with c2:
                 if st.button("Clear", key="remove_groq", use_container_width=True):
                     st.session_state.user_groq_key = ""
-                    st.session_state.pop("chatbot_initialized", None)
-                    st.session_state.pop("chatbot", None)
+                    _reset_chatbot()
                     st.rerun()
 
         st.markdown("---")
@@ -912,6 +1013,10 @@ def main():
     if "messages" not in st.session_state:
         st.session_state.messages = []
 
+    # Resolve the (process-cached) chatbot once per rerun — handlers below
+    # share this reference instead of each fetching their own.
+    chatbot = _get_chatbot()
+
     # ── PDF upload panel ────────────────────────────────────────────────────
     with st.expander(
         "📄 Upload Research Papers",
@@ -954,6 +1059,19 @@ def main():
                 )
             )
 
+    _chat_panel(user, chatbot)
+
+
+@st.fragment
+def _chat_panel(user: dict, chatbot: "StreamlitChatbot") -> None:
+    """
+    Chat history + input, isolated in a fragment so a chat interaction reruns
+    only this panel instead of the whole script. The sidebar (account box,
+    provider status, example buttons) stays static during a chat turn; its
+    counters refresh on the next full rerun. Sidebar example buttons still
+    call st.rerun(), which triggers a full-script run, so pending_example is
+    picked up here as before.
+    """
     # ── Chat history ────────────────────────────────────────────────────────
     for idx, msg in enumerate(st.session_state.messages):
         with st.chat_message(msg["role"]):
@@ -993,7 +1111,6 @@ def main():
 
         with st.chat_message("assistant"):
             try:
-                chatbot = StreamlitChatbot()
                 # Set context vars before graph.stream() — tools read these instead of
                 # st.session_state (which is not reliably accessible in LangGraph threads)
                 _active_user_id.set(str(user["id"]))
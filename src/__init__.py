@@ -11,7 +11,7 @@ __email__ = "your.email@example.com"
 
 from .tools import initialize_tools
 from .models import ConversationState, EnhancedLLM
-from .nodes import create_agent_nodes, route_after_supervisor
+from .nodes import create_agent_nodes, route_after_supervisor, route_after_agent
 from .conversation import ConversationManager
 
 __all__ = [
@@ -20,5 +20,6 @@ __all__ = [
     "EnhancedLLM",
     "create_agent_nodes",
     "route_after_supervisor",
+    "route_after_agent",
     "ConversationManager",
 ]
\ No newline at end of file
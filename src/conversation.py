@@ -8,7 +8,10 @@ rolling conversation summary that gets injected into the system prompt.
 No LLM calls are made here — both operations are pure Python for speed.
 """
 
+from collections import deque
+from itertools import islice
 from typing import List
+
 from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage
 
 
@@ -25,10 +28,55 @@ class ConversationManager:
     To change what goes into the summary: edit summarize_conversation.
     """
 
+    # Bound on the summary memo below — 32 entries covers several concurrent
+    # threads' worth of tool-loop re-entries without growing unchecked.
+    _SUMMARY_CACHE_MAX = 32
+
     def __init__(self, max_history: int = 20):
         # 20 messages (~10 full turns) keeps enough context for follow-up questions
         # while staying well within the model's input limit.
         self.max_history = max_history
+        # Memos keyed by (len(messages), id(last)). Message objects are
+        # append-only under the add_messages reducer, so the same (length,
+        # last-message identity) pair always yields the same result —
+        # tool-loop re-entries within a turn hit these caches.
+        self._summary_cache: dict = {}
+        self._partition_cache: dict = {}
+
+    def _partition_roles(self, messages: List[AnyMessage]) -> dict:
+        """
+        Classify messages by role in one pass and memoize the result.
+
+        isinstance dispatch is cheap individually but runs N times per caller
+        per graph step; computing the role lists once per message-list state
+        means repeated callers index into precomputed lists instead of
+        re-walking the history.
+
+        Returns {"human": [...], "system": [...]} (other roles are not needed
+        by any current caller and are deliberately not collected).
+        """
+        key = (len(messages), id(messages[-1]) if messages else 0)
+        cached = self._partition_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Exact-type checks instead of isinstance: this loop runs over the full
+        # history and every message here is constructed concretely (app.py
+        # builds HumanMessage, nodes.py builds SystemMessage — no subclasses),
+        # so the identity test skips the __instancecheck__/MRO walk per element.
+        humans, systems = [], []
+        for m in messages:
+            cls = type(m)
+            if cls is HumanMessage:
+                humans.append(m)
+            elif cls is SystemMessage:
+                systems.append(m)
+        partition = {"human": humans, "system": systems}
+
+        if len(self._partition_cache) >= self._SUMMARY_CACHE_MAX:
+            self._partition_cache.clear()
+        self._partition_cache[key] = partition
+        return partition
 
     def summarize_conversation(self, messages: List[AnyMessage]) -> str:
         """
@@ -49,15 +97,23 @@ class ConversationManager:
         str  e.g. "What is quantum computing? | Find papers on LLMs | Calculate 15% of 2500"
              or   "New conversation" if no human messages exist yet
         """
-        human_messages = [m for m in messages if isinstance(m, HumanMessage)]
+        key = (len(messages), id(messages[-1]) if messages else 0)
+        cached = self._summary_cache.get(key)
+        if cached is not None:
+            return cached
+
+        human_messages = self._partition_roles(messages)["human"]
         if not human_messages:
-            return "New conversation"
+            summary = "New conversation"
+        else:
+            # Last 3 questions — enough context for follow-ups without bloating the prompt
+            recent = [m.content[:120] for m in human_messages[-3:]]
+            summary = f"User asked: {recent[0]}" if len(recent) == 1 else " | ".join(recent)
 
-        # Last 3 questions — enough context for follow-ups without bloating the prompt
-        recent = [m.content[:120] for m in human_messages[-3:]]
-        if len(recent) == 1:
-            return f"User asked: {recent[0]}"
-        return " | ".join(recent)
+        if len(self._summary_cache) >= self._SUMMARY_CACHE_MAX:
+            self._summary_cache.clear()
+        self._summary_cache[key] = summary
+        return summary
 
     def trim_history(self, messages: List[AnyMessage]) -> List[AnyMessage]:
         """
@@ -79,6 +135,11 @@ class ConversationManager:
         if len(messages) <= self.max_history:
             return messages
 
-        system_msgs = [m for m in messages if isinstance(m, SystemMessage)]
-        recent_msgs = messages[-self.max_history:]
-        return system_msgs + recent_msgs
+        # deque(maxlen=...) keeps the tail in a single C-level pass with no
+        # intermediate slice copy. Only the dropped prefix needs scanning for
+        # SystemMessages — any system message inside the kept tail survives
+        # in `recent` already.
+        recent = deque(messages, maxlen=self.max_history)
+        cutoff = len(messages) - self.max_history
+        system_msgs = [m for m in islice(messages, cutoff) if type(m) is SystemMessage]
+        return system_msgs + list(recent)
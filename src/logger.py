@@ -7,6 +7,10 @@ All modules should import get_logger from here instead of calling
 logging.basicConfig() directly — this ensures consistent formatting,
 a single log file, and avoids duplicate handlers across module reloads.
 
+Records are handed off through a queue to a background listener thread, so
+the calling thread (an agent node or tool call mid-turn) never blocks on a
+console flush or file write — emitting a record is just an enqueue.
+
 Usage:
     from src.logger import get_logger
     logger = get_logger(__name__)
@@ -14,33 +18,23 @@ Usage:
     logger.error("LLM call failed: %s", exc)
 """
 
+import atexit
 import logging
 import logging.handlers
 from pathlib import Path
+from queue import SimpleQueue
 
+# Shared by every logger from this module: one queue, one listener thread,
+# one set of output handlers. Built lazily on the first get_logger() call.
+_log_queue = None
+_listener = None
 
-def get_logger(name: str) -> logging.Logger:
-    """
-    Return a named logger writing to both console (INFO+) and a rotating
-    log file at logs/app.log (DEBUG+).
 
-    Safe to call multiple times with the same name — handlers are only
-    attached once (guard on logger.handlers).
-
-    Parameters
-    ----------
-    name : str
-        Typically __name__ of the calling module. Shows up in log lines as
-        the logger name, e.g. "src.nodes", "src.tools", "__main__".
-    """
-    logger = logging.getLogger(name)
-
-    # Avoid adding duplicate handlers if the same logger is retrieved again
-    # (Streamlit reruns modules on every interaction)
-    if logger.handlers:
-        return logger
-
-    logger.setLevel(logging.DEBUG)
+def _ensure_listener() -> SimpleQueue:
+    """Build the output handlers and start the background listener once."""
+    global _log_queue, _listener
+    if _listener is not None:
+        return _log_queue
 
     fmt = logging.Formatter(
         "%(asctime)s [%(levelname)-8s] %(name)s: %(message)s",
@@ -51,7 +45,6 @@ def get_logger(name: str) -> logging.Logger:
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(fmt)
-    logger.addHandler(console_handler)
 
     # Rotating file: DEBUG and above for full diagnostics
     # 5 MB per file, 3 backups → max ~20 MB on disk
@@ -65,7 +58,41 @@ def get_logger(name: str) -> logging.Logger:
     )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(fmt)
-    logger.addHandler(file_handler)
+
+    _log_queue = SimpleQueue()
+    # respect_handler_level keeps the per-handler thresholds above working
+    # exactly as they did when handlers were attached directly.
+    _listener = logging.handlers.QueueListener(
+        _log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)   # flush queued records on shutdown
+    return _log_queue
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Return a named logger writing to both console (INFO+) and a rotating
+    log file at logs/app.log (DEBUG+), via a non-blocking queue handoff.
+
+    Safe to call multiple times with the same name — handlers are only
+    attached once (guard on logger.handlers).
+
+    Parameters
+    ----------
+    name : str
+        Typically __name__ of the calling module. Shows up in log lines as
+        the logger name, e.g. "src.nodes", "src.tools", "__main__".
+    """
+    logger = logging.getLogger(name)
+
+    # Avoid adding duplicate handlers if the same logger is retrieved again
+    # (Streamlit reruns modules on every interaction)
+    if logger.handlers:
+        return logger
+
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(logging.handlers.QueueHandler(_ensure_listener()))
 
     # Don't propagate to the root logger — avoids double-printing when
     # third-party libraries also call logging.basicConfig()
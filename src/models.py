@@ -15,8 +15,10 @@ Graph nodes (nodes.py) import EnhancedLLM and ConversationState.
 app.py imports both to build the LangGraph graph.
 """
 
+import contextvars
 import os
 import time
+from dataclasses import dataclass
 from typing import List, Dict, Any, Annotated, Optional
 from typing_extensions import TypedDict
 from langchain_core.messages import AnyMessage
@@ -26,11 +28,38 @@ from .logger import get_logger
 
 logger = get_logger(__name__)
 
+# Per-request model override, set by app.py before each graph invocation —
+# the same pattern as tools._active_user_id. The EnhancedLLM manager is a
+# process-wide singleton shared by every logged-in session, so a sidebar
+# model selection must travel with the request, not be written onto the
+# shared manager where it would switch models for everyone.
+_forced_model: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "forced_model", default=None
+)
+
 
 # ---------------------------------------------------------------------------
 # State schema
 # ---------------------------------------------------------------------------
 
+@dataclass(slots=True)
+class RunStats:
+    """
+    Per-turn bookkeeping, grouped under one state key.
+
+    These four values were previously independent ConversationState fields;
+    the checkpointer serializes the whole state on every graph step, so
+    packing them into a single slotted dataclass means one small object per
+    snapshot instead of four separate dict entries. Nodes return a fresh
+    instance via dataclasses.replace rather than mutating, so checkpoint
+    snapshots never alias live state.
+    """
+    error_count: int = 0
+    last_tool_used: str = ""
+    current_model_used: str = ""
+    model_switch_count: int = 0
+
+
 class ConversationState(TypedDict):
     """
     The single state object passed between every LangGraph node.
@@ -45,12 +74,9 @@ class ConversationState(TypedDict):
     """
     messages: Annotated[List[AnyMessage], add_messages]
     user_context: Dict[str, Any]
-    tool_results_cache: Dict[str, Any]
     conversation_summary: str
-    error_count: int
-    last_tool_used: str
-    current_model_used: str
-    model_switch_count: int
+    last_human_content: str  # latest user message; set at ingest so nodes skip history scans
+    stats: RunStats          # error/tool/model bookkeeping, one key per snapshot
     current_agent: str       # "research" | "pdf"
     active_pdfs: List[str]   # PDF names available for this user session
 
@@ -68,6 +94,19 @@ TASK_TEMPERATURES = {
     "creative":  0.7,   # higher entropy for more varied, interesting text
 }
 
+# Which config slot each task type routes to. Module-level so
+# get_model_for_task doesn't rebuild a mapping dict on every call;
+# the concrete ModelConfig differs per provider chain, so this stores the
+# slot name rather than the config object.
+TASK_MODEL_SLOT = {
+    "reasoning": "secondary",   # research/analysis: deeper model
+    "math":      "primary",
+    "analysis":  "secondary",
+    "coding":    "primary",
+    "creative":  "primary",
+    "general":   "primary",
+}
+
 
 # ---------------------------------------------------------------------------
 # Model configuration
@@ -187,6 +226,10 @@ class EnhancedLLM:
         self.cooldown_period  = 60    # seconds before a failed model is retried
         # When set by the UI model selector, bypasses task-based routing entirely
         self.user_forced_model: Optional[str] = None
+        # Memoized client instances keyed by (provider, name, temperature).
+        # Clients are stateless request wrappers, so one instance per
+        # configuration can be reused for the lifetime of the manager.
+        self._instance_cache: Dict[Any, Any] = {}
 
     def _is_model_available(self, config: ModelConfig) -> bool:
         """Returns False if the model is within the post-failure cooldown window."""
@@ -200,11 +243,18 @@ class EnhancedLLM:
         Returns None on failure and records failure time for cooldown tracking.
 
         No probe/test call is made here — failures surface at invoke() time
-        and are caught by context_aware_llm's fallback cascade in nodes.py.
+        and are caught by the fallback cascade in nodes.py. Instances are
+        memoized per (provider, name, temperature) so repeat requests skip
+        client construction entirely.
         """
         try:
             temp = temperature if temperature is not None else config.temperature
 
+            cache_key = (config.provider, config.name, temp)
+            cached = self._instance_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
             if config.provider == "anthropic":
                 from langchain_anthropic import ChatAnthropic
                 # Claude 4 models dropped the temperature parameter — omit it entirely
@@ -212,6 +262,7 @@ class EnhancedLLM:
                 llm = ChatAnthropic(
                     model=config.name,
                     max_tokens=config.max_tokens,
+                    streaming=True,
                 )
             elif config.provider == "openai":
                 from langchain_openai import ChatOpenAI
@@ -219,14 +270,17 @@ class EnhancedLLM:
                     model=config.name,
                     temperature=temp,
                     max_tokens=config.max_tokens,
+                    streaming=True,
                 )
             else:  # groq
                 llm = ChatGroq(
                     model=config.name,
                     temperature=temp,
                     max_tokens=config.max_tokens,
+                    streaming=True,
                 )
 
+            self._instance_cache[cache_key] = llm
             config.success_count += 1
             logger.info(f"Initialized {config.provider}/{config.name}")
             return llm
@@ -246,6 +300,11 @@ class EnhancedLLM:
         """
         self.total_requests += 1
 
+        # Session-scoped override (sidebar selector) applies unless the caller
+        # forced a specific model explicitly.
+        if force_model is None:
+            force_model = _forced_model.get()
+
         if force_model:
             for config in [self.primary_config, self.secondary_config] + self.fallback_configs:
                 if config.name == force_model:
@@ -287,6 +346,67 @@ class EnhancedLLM:
 
         raise Exception("All models failed. Check API keys and internet connection.")
 
+    async def aget_response(self, messages, prefer_secondary: bool = False):
+        """
+        Race the two best available models concurrently and return the first
+        successful response, cancelling the slower task.
+
+        Unlike get_llm()'s sequential walk — where a slow or throttled primary
+        adds its full latency before the secondary is even tried — this fans
+        the same request out with ainvoke() and takes whichever answers first,
+        so tail latency is min() of the candidates instead of their sum.
+        Losing tasks are cancelled; failed ones get the usual cooldown
+        bookkeeping.
+
+        Opt-in for async callers (e.g. graph nodes run via ainvoke/astream).
+        The synchronous Streamlit path keeps using get_llm().
+        """
+        import asyncio
+
+        ordered = (
+            [self.secondary_config, self.primary_config]
+            if prefer_secondary or self.use_secondary
+            else [self.primary_config, self.secondary_config]
+        )
+
+        candidates = []
+        for config in ordered + self.fallback_configs:
+            if not self._is_model_available(config):
+                continue
+            llm = self._create_llm_instance(config)
+            if llm:
+                candidates.append((config, llm))
+            if len(candidates) == 2:
+                break
+
+        if not candidates:
+            raise Exception("All models failed. Check API keys and internet connection.")
+
+        self.total_requests += 1
+        tasks = {
+            asyncio.create_task(llm.ainvoke(messages)): config
+            for config, llm in candidates
+        }
+        pending = set(tasks)
+        last_error: Optional[BaseException] = None
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                config = tasks[task]
+                exc = task.exception()
+                if exc is None:
+                    for loser in pending:
+                        loser.cancel()
+                    self.current_config = config
+                    return task.result()
+                config.failure_count += 1
+                config.last_failure_time = time.time()
+                last_error = exc
+                logger.warning("aget_response: %s failed: %s", config.name, exc)
+
+        raise Exception(f"All raced models failed. Last error: {last_error}")
+
     def get_primary_llm(self, **kwargs):
         return self.get_llm(prefer_secondary=False, **kwargs)
 
@@ -303,26 +423,25 @@ class EnhancedLLM:
         """
         Selects model + temperature for the given task type.
 
-        If user_forced_model is set (via the sidebar model selector), that model is always
-        used regardless of task type — user choice overrides automatic routing.
+        If the session selected a model in the sidebar (carried per-request in
+        the _forced_model ContextVar) — or user_forced_model is set on the
+        manager for non-Streamlit callers — that model is always used
+        regardless of task type: user choice overrides automatic routing.
 
         Otherwise routes by task: complex tasks get secondary, simple tasks get primary.
         Falls back to get_llm() if the preferred model is in cooldown.
         """
-        if self.user_forced_model:
-            return self.get_llm(force_model=self.user_forced_model)
-
-        task_model_mapping = {
-            "reasoning": self.secondary_config,   # research/analysis: deeper model
-            "math":      self.primary_config,
-            "analysis":  self.secondary_config,
-            "coding":    self.primary_config,
-            "creative":  self.primary_config,
-            "general":   self.primary_config,
-        }
-
-        temperature    = TASK_TEMPERATURES.get(task_type.lower(), 0.1)
-        preferred      = task_model_mapping.get(task_type.lower(), self.primary_config)
+        forced = _forced_model.get() or self.user_forced_model
+        if forced:
+            return self.get_llm(force_model=forced)
+
+        task        = task_type.lower()
+        temperature = TASK_TEMPERATURES.get(task, 0.1)
+        preferred   = (
+            self.secondary_config
+            if TASK_MODEL_SLOT.get(task, "primary") == "secondary"
+            else self.primary_config
+        )
 
         if self._is_model_available(preferred):
             llm = self._create_llm_instance(preferred, temperature=temperature)
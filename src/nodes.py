@@ -8,7 +8,8 @@ Agents:
   research_agent     - handles academic search, web, code, math queries
   pdf_agent          - handles uploaded PDF analysis + literature connection
 
-Tool nodes (each agent has its own isolated ToolNode):
+Tool nodes (each agent has its own isolated tool set; independent tool calls
+within a turn are dispatched concurrently):
   research_tool_node - all tools except pdf_search
   pdf_tool_node      - pdf_search + arxiv + semantic_scholar + find_related_papers
 
@@ -23,13 +24,20 @@ Helper:
     -> keyword-based temperature + model routing
 """
 
+import contextvars
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
 from typing import List, Callable
 from langchain_core.messages import (
     AIMessage, SystemMessage, HumanMessage, ToolMessage, BaseMessage,
 )
-from langgraph.prebuilt import ToolNode, tools_condition
-from .models import ConversationState, EnhancedLLM
-from .tools import _active_pdf_names
+from .models import ConversationState, EnhancedLLM, RunStats
+from .tools import _active_pdf_names, _active_user_id
 from .logger import get_logger
 
 logger = get_logger(__name__)
@@ -75,12 +83,16 @@ def supervisor_node(state: ConversationState) -> dict:
       3. Papers loaded, ambiguous query        -> pdf_agent  (default with papers)
       4. No papers, no clear signal            -> research_agent
     """
-    messages = state.get("messages", [])
-    msg = ""
-    for m in reversed(messages):
-        if isinstance(m, HumanMessage):
-            msg = m.content.lower()
-            break
+    # last_human_content is set at ingest (_initial_state), so no history scan
+    # is needed; the reversed walk remains as a fallback for checkpoints
+    # written before the field existed.
+    msg = state.get("last_human_content", "")
+    if not msg:
+        for m in reversed(state.get("messages", [])):
+            if isinstance(m, HumanMessage):
+                msg = m.content
+                break
+    msg = msg.lower()
 
     pdf_names = _active_pdf_names.get()
     has_pdfs  = bool(pdf_names)
@@ -116,17 +128,43 @@ def route_after_supervisor(state: ConversationState) -> str:
     return state.get("current_agent", "research") + "_agent"
 
 
+def route_after_agent(state: ConversationState) -> str:
+    """
+    LangGraph conditional edge after each agent node: "tools" when the last
+    AIMessage requested tool calls, "__end__" otherwise.
+
+    Replaces langgraph.prebuilt.tools_condition — one attribute check on the
+    last message, with no dependence on the prebuilt module's state-shape
+    handling. Deliberately does NOT skip the agent re-entry after tools run:
+    both agent prompts require synthesizing tool output into a final answer,
+    so a heuristic that returns raw tool results would regress quality.
+    """
+    messages = state.get("messages", [])
+    last = messages[-1] if messages else None
+    if getattr(last, "tool_calls", None):
+        return "tools"
+    return "__end__"
+
+
 # ---------------------------------------------------------------------------
 # System prompts — one per agent
 # ---------------------------------------------------------------------------
 
-def _research_prompt(state: ConversationState, pdf_ctx: str) -> str:
-    return f"""You are an elite AI research intelligence assistant — expert academic researcher, \
+def _last_tool(state: ConversationState) -> str:
+    """Last tool name from the stats struct, or 'None' for a fresh turn."""
+    stats = state.get("stats")
+    return (stats.last_tool_used if stats else "") or "None"
+
+
+# Prompt bodies are module-level templates: only the three ACTIVE CONTEXT
+# fields vary per turn, so each call formats three short strings instead of
+# re-evaluating a multi-kilobyte f-string.
+_RESEARCH_PROMPT_TEMPLATE = """You are an elite AI research intelligence assistant — expert academic researcher, \
 data scientist, and knowledge synthesizer.
 
 ACTIVE CONTEXT:
-- Conversation: {state.get('conversation_summary', 'New conversation')}
-- Last tool used: {state.get('last_tool_used', 'None')}
+- Conversation: {summary}
+- Last tool used: {last_tool}
 - {pdf_ctx}
 
 TOOL SELECTION (follow this priority exactly):
@@ -167,12 +205,11 @@ When you used a tool OR made factual/research claims, end with:
 For greetings or simple questions: do NOT add a References section."""
 
 
-def _pdf_prompt(state: ConversationState, pdf_ctx: str) -> str:
-    return f"""You are a research paper analysis specialist with deep expertise in academic literature.
+_PDF_PROMPT_TEMPLATE = """You are a research paper analysis specialist with deep expertise in academic literature.
 
 ACTIVE CONTEXT:
-- Conversation: {state.get('conversation_summary', 'New conversation')}
-- Last tool used: {state.get('last_tool_used', 'None')}
+- Conversation: {summary}
+- Last tool used: {last_tool}
 - {pdf_ctx}
 
 YOUR MISSION: Help the user deeply understand their uploaded research paper and
@@ -213,6 +250,22 @@ CITATIONS:
 Always end with a ## References section when tools were used."""
 
 
+def _research_prompt(state: ConversationState, pdf_ctx: str) -> str:
+    return _RESEARCH_PROMPT_TEMPLATE.format(
+        summary=state.get("conversation_summary", "New conversation"),
+        last_tool=_last_tool(state),
+        pdf_ctx=pdf_ctx,
+    )
+
+
+def _pdf_prompt(state: ConversationState, pdf_ctx: str) -> str:
+    return _PDF_PROMPT_TEMPLATE.format(
+        summary=state.get("conversation_summary", "New conversation"),
+        last_tool=_last_tool(state),
+        pdf_ctx=pdf_ctx,
+    )
+
+
 # ---------------------------------------------------------------------------
 # Generic LLM node factory (shared by both agents)
 # ---------------------------------------------------------------------------
@@ -234,11 +287,27 @@ def _make_llm_node(
     agent_label : "research" or "pdf" — for logging only
     """
 
+    # bind_tools() constructs a fresh runnable and re-serializes every tool
+    # schema on each call. The underlying llm objects are already cached per
+    # config (models._instance_cache), so the bound wrapper is cached here per
+    # instance. Keyed by id() with the llm stored alongside to pin it alive —
+    # otherwise a garbage-collected instance could hand its id to a new one.
+    _bound_cache: dict = {}
+
+    def _bind(llm):
+        entry = _bound_cache.get(id(llm))
+        if entry is None or entry[0] is not llm:
+            entry = (llm, llm.bind_tools(tools))
+            _bound_cache[id(llm)] = entry
+        return entry[1]
+
     def node(state: ConversationState) -> dict:
         messages = state.get("messages", [])
 
         try:
-            last_human = next(
+            # O(1) read of the ingest-tracked field, with the reversed scan as
+            # fallback for pre-existing checkpoints.
+            last_human = state.get("last_human_content") or next(
                 (m.content for m in reversed(messages) if isinstance(m, HumanMessage)),
                 None,
             )
@@ -247,7 +316,7 @@ def _make_llm_node(
                 if last_human
                 else llm_manager.get_llm()
             )
-            llm_with_tools = llm.bind_tools(tools)
+            llm_with_tools = _bind(llm)
 
             # Build pdf context string injected into the system prompt every turn
             pdf_names = _active_pdf_names.get()
@@ -261,23 +330,31 @@ def _make_llm_node(
 
             system_prompt = get_prompt(state, pdf_ctx)
 
-            # Replace existing SystemMessage each turn so the prompt is always fresh
-            non_system = [m for m in messages if not isinstance(m, SystemMessage)]
+            # Replace the existing SystemMessage each turn so the prompt is
+            # always fresh. A system message can only sit at index 0 — this
+            # node injects it there and trim_history keeps system messages
+            # first — so checking one element replaces the full-history scan.
+            non_system = (
+                messages[1:]
+                if messages and isinstance(messages[0], SystemMessage)
+                else messages
+            )
             full_messages = [SystemMessage(content=system_prompt)] + non_system
 
             response      = llm_with_tools.invoke(full_messages)
             current_model = llm_manager.get_current_model_name()
             logger.info("%s_agent: %s/%s", agent_label, llm_manager.get_provider(), current_model)
 
+            stats = state.get("stats") or RunStats()
             return {
-                "messages":           [response],
-                "error_count":        0,
-                "current_model_used": current_model,
+                "messages": [response],
+                "stats":    replace(stats, error_count=0, current_model_used=current_model),
             }
 
         except Exception as e:
             logger.error("%s_agent: LLM call failed: %s", agent_label, e)
-            error_count = state.get("error_count", 0) + 1
+            stats       = state.get("stats") or RunStats()
+            error_count = stats.error_count + 1
             last_error  = str(e)
 
             # Walk fallback chain in declared order, skipping the model that just failed.
@@ -302,13 +379,17 @@ def _make_llm_node(
                         msgs_to_send = _flatten_messages_for_groq(messages)
                         if config.max_tokens <= 2048:
                             msgs_to_send = msgs_to_send[:1] + msgs_to_send[-3:]
-                    response = fallback_llm.bind_tools(tools).invoke(msgs_to_send)
+                    response = _bind(fallback_llm).invoke(msgs_to_send)
                     llm_manager.current_config = config
                     logger.info("%s_agent: switched to fallback %s", agent_label, config.name)
                     return {
-                        "messages":           [response],
-                        "error_count":        0,
-                        "current_model_used": config.name,
+                        "messages": [response],
+                        "stats":    replace(
+                            stats,
+                            error_count=0,
+                            current_model_used=config.name,
+                            model_switch_count=stats.model_switch_count + 1,
+                        ),
                     }
                 except Exception as fe:
                     last_error = str(fe)
@@ -322,57 +403,232 @@ def _make_llm_node(
                 else f"All models failed. Last error: {last_error}"
             )
             return {
-                "messages":    [AIMessage(content=user_msg)],
-                "error_count": error_count,
+                "messages": [AIMessage(content=user_msg)],
+                "stats":    replace(stats, error_count=error_count),
             }
 
     return node
 
 
 # ---------------------------------------------------------------------------
-# Tool node factory — wraps ToolNode with graceful error handling
+# Tool node factory — concurrent dispatch with graceful error handling
 # ---------------------------------------------------------------------------
 
-def _make_tool_node(tools: List) -> Callable:
-    """Wraps LangGraph's ToolNode; converts crashes into recovery ToolMessages."""
+def _tool_cache_key(name: str, args: dict) -> str:
+    """
+    Stable cache key for one tool call: tool name + blake2b digest of the
+    canonical JSON of its arguments.
 
-    def node(state: ConversationState) -> dict:
+    blake2b (stdlib, SIMD-accelerated) rather than builtin hash(): Python's
+    hash is salted per process, so keys wouldn't survive a restart or match
+    across workers, and hashing a 100-char prefix (the obvious shortcut)
+    collides for tools whose queries share long prefixes.
+
+    Hashing cost is bounded for pathological inputs (e.g. code_analyzer
+    handed a whole file): past 4 KiB only a prefix is hashed, with the total
+    length appended so equal-prefix payloads of different sizes stay distinct.
+
+    pdf_search keys additionally carry the active user id and PDF set: its
+    output depends on which documents are loaded, and the result cache is
+    process-wide, so identical queries from different sessions must not alias.
+    """
+    payload = json.dumps(args, sort_keys=True, default=str).encode("utf-8")
+    if len(payload) > 4096:
+        payload = payload[:4096] + b"#%d" % len(payload)
+    digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    if name == "pdf_search":
+        scope = f"{_active_user_id.get()}|{'|'.join(sorted(_active_pdf_names.get()))}"
+        return f"{name}:{scope}:{digest}"
+    return f"{name}:{digest}"
+
+
+# Process-wide tool-result cache with LRU eviction. Previously this lived in
+# ConversationState, which meant every checkpoint snapshot serialized the
+# whole (unbounded) dict. Keeping it out of state bounds memory, shrinks
+# snapshots, and lets identical queries hit across sessions. OrderedDict
+# move_to_end/popitem gives O(1) recency updates and eviction.
+_TOOL_CACHE_MAX = 512
+_tool_cache: OrderedDict = OrderedDict()
+_tool_cache_lock = threading.Lock()
+
+
+def _tool_cache_get(key: str):
+    with _tool_cache_lock:
+        content = _tool_cache.get(key)
+        if content is not None:
+            _tool_cache.move_to_end(key)
+        return content
+
+
+def _tool_cache_put(key: str, content: str) -> None:
+    with _tool_cache_lock:
+        _tool_cache[key] = content
+        _tool_cache.move_to_end(key)
+        while len(_tool_cache) > _TOOL_CACHE_MAX:
+            _tool_cache.popitem(last=False)
+
+
+# One shared pool for all tool dispatch rather than a fresh ThreadPoolExecutor
+# per node invocation: thread creation/teardown is off the request path, and
+# the worker cap bounds total outbound API concurrency across every session in
+# the process. 5 workers matches the most tools an agent realistically fans
+# out to in one response.
+_TOOL_POOL = ThreadPoolExecutor(max_workers=5, thread_name_prefix="tool-dispatch")
+
+# In-flight request coalescing: when two identical (tool, args) calls overlap
+# — duplicates within one batch, or concurrent sessions asking the same thing —
+# only the first actually invokes the tool; the rest wait on its Future and
+# share the result. Keyed by _tool_cache_key, guarded by a plain lock (entries
+# live only for the duration of one tool call, so contention is negligible).
+_inflight_lock = threading.Lock()
+_inflight: dict = {}
+
+
+# Several tools report their own failures as strings instead of raising
+# ("Error: ...", "PDF search error: ...", "arXiv error: ..."). Those count as
+# successful invocations for error bookkeeping, but they must never enter the
+# result cache — a transient failure would otherwise be replayed to every
+# later identical query until eviction.
+_SELF_REPORTED_FAILURE = re.compile(
+    r"^(?:Tool error:|Error[: ]|PDF search error:|arXiv error:|Semantic Scholar error:)"
+)
+
+
+def _invoke_tool(tool_map: dict, tool_call: dict) -> tuple:
+    """
+    Run one tool call and return (ok, content) — crashes become recovery
+    messages with ok=False so the agent can try a different approach instead
+    of the whole graph step failing. ok is the explicit success signal used
+    for caching and error counting; callers must not infer it from content.
+    """
+    name = tool_call.get("name", "")
+    tool = tool_map.get(name)
+    if tool is None:
+        return False, f"Tool error: unknown tool '{name}'. Try a different approach."
+    try:
+        output = tool.invoke(tool_call.get("args", {}))
+        return True, output if isinstance(output, str) else str(output)
+    except Exception as e:
+        logger.error("tool_node: %s failed: %s", name, e)
+        return False, f"Tool error: {e}. Try a different approach."
+
+
+def _execute_tool_call(tool_map: dict, tool_call: dict, key: str) -> tuple:
+    """
+    Execute one tool call, coalescing with any identical call already running.
+
+    The first caller for a key owns the Future and performs the real
+    invocation; concurrent duplicates block on fut.result() and reuse its
+    (ok, content) outcome under their own tool_call_id.
+
+    Returns (ok, ToolMessage).
+    """
+    with _inflight_lock:
+        fut = _inflight.get(key)
+        owner = fut is None
+        if owner:
+            fut = Future()
+            _inflight[key] = fut
+
+    if owner:
         try:
-            result = ToolNode(tools).invoke(state)
-            messages = result.get("messages", [])
-            if messages:
-                result.update({
-                    "messages":       messages,
-                    "last_tool_used": getattr(messages[-1], "name", "unknown_tool"),
-                    "error_count":    0,
-                })
-            return result
+            ok, content = _invoke_tool(tool_map, tool_call)
+            fut.set_result((ok, content))
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+    else:
+        logger.info("tool_node: coalesced duplicate %s call", tool_call.get("name"))
+        ok, content = fut.result()
 
-        except Exception as e:
-            logger.error("tool_node: %s", e)
-            messages    = state.get("messages", [])
-            last_ai_msg = next(
-                (m for m in reversed(messages)
-                 if isinstance(m, AIMessage) and getattr(m, "tool_calls", None)),
-                None,
-            )
-            if last_ai_msg:
-                return {
-                    "messages": [
-                        ToolMessage(
-                            content=f"Tool error: {e}. Try a different approach.",
-                            tool_call_id=tc["id"],
-                            name=tc["name"],
-                        )
-                        for tc in last_ai_msg.tool_calls
-                    ],
-                    "error_count": state.get("error_count", 0) + 1,
-                }
+    return ok, ToolMessage(
+        content=content,
+        tool_call_id=tool_call["id"],
+        name=tool_call.get("name") or "unknown_tool",
+    )
+
+
+def _make_tool_node(tools: List) -> Callable:
+    """
+    Builds a tool-execution node for one agent.
+
+    When the LLM emits several tool_calls in one response (e.g. arxiv +
+    semantic_scholar + duckduckgo), they are all independent network requests,
+    so they run concurrently on a thread pool — turn latency becomes the max
+    of the individual calls instead of their sum. Single calls skip the pool.
+    """
+    # The agent's tool set is fixed at graph-build time, so the name→tool
+    # dispatch table is built once here instead of on every node invocation.
+    tool_map = {getattr(t, "name", ""): t for t in tools}
+
+    def node(state: ConversationState) -> dict:
+        messages = state.get("messages", [])
+        last_ai_msg = next(
+            (m for m in reversed(messages)
+             if isinstance(m, AIMessage) and getattr(m, "tool_calls", None)),
+            None,
+        )
+        stats = state.get("stats") or RunStats()
+        tool_calls = list(last_ai_msg.tool_calls) if last_ai_msg else []
+        if not tool_calls:
             return {
-                "messages":    [AIMessage(content=f"Error using tools: {e}")],
-                "error_count": state.get("error_count", 0) + 1,
+                "messages": [AIMessage(content="Error using tools: no tool calls found.")],
+                "stats":    replace(stats, error_count=stats.error_count + 1),
             }
 
+        # Serve identical (tool, args) calls from the process-wide LRU — the
+        # prompts tell the model not to repeat tool calls, but when it does
+        # anyway the repeat costs a dict lookup instead of a network round-trip.
+        keys = [_tool_cache_key(tc.get("name", ""), tc.get("args", {})) for tc in tool_calls]
+
+        results: List = [None] * len(tool_calls)
+        oks:     List = [True] * len(tool_calls)   # cache hits are successes
+        pending = []
+        for i, (tc, key) in enumerate(zip(tool_calls, keys)):
+            cached = _tool_cache_get(key)
+            if cached is not None:
+                logger.info("tool_node: cache hit for %s", tc.get("name"))
+                results[i] = ToolMessage(
+                    content=cached, tool_call_id=tc["id"], name=tc.get("name", "")
+                )
+            else:
+                pending.append(i)
+
+        if len(pending) == 1:
+            i = pending[0]
+            oks[i], results[i] = _execute_tool_call(tool_map, tool_calls[i], keys[i])
+        elif pending:
+            # Pool workers do not inherit the caller's ContextVars, but tools
+            # read per-request context from them (pdf_search needs
+            # _active_user_id / _active_pdf_names). Capture the current
+            # context per call and run inside it — one Context object cannot
+            # be entered concurrently, hence a fresh copy for each submission.
+            futures = [
+                _TOOL_POOL.submit(
+                    contextvars.copy_context().run,
+                    _execute_tool_call, tool_map, tool_calls[i], keys[i],
+                )
+                for i in pending
+            ]
+            for i, fut in zip(pending, futures):
+                oks[i], results[i] = fut.result()
+
+        # Only clean successes are cached — invoke-level failures and
+        # tool-self-reported error strings must be retried, not replayed.
+        for i in pending:
+            if oks[i] and not _SELF_REPORTED_FAILURE.match(results[i].content):
+                _tool_cache_put(keys[i], results[i].content)
+
+        errored = not all(oks)
+        return {
+            "messages":           results,
+            "stats":              replace(
+                stats,
+                last_tool_used=getattr(results[-1], "name", "unknown_tool"),
+                error_count=stats.error_count + 1 if errored else 0,
+            ),
+        }
+
     return node
 
 
@@ -420,30 +676,60 @@ def create_agent_nodes(tools: List, llm_manager: EnhancedLLM):
 # Task-based LLM routing (shared by both agents)
 # ---------------------------------------------------------------------------
 
+# Keyword sets per task type, in priority order — a "math" hit wins over a
+# "reasoning" hit, matching the old if/elif chain. Substring (not whole-word)
+# matching is preserved deliberately: "%" and "solve" inside larger tokens
+# should still classify. Frozensets because membership/identity of the
+# keyword collection is what matters; match ordering inside one category is
+# irrelevant (all hits carry the same priority rank).
+_TASK_KEYWORDS = (
+    ("math",      frozenset({"calculate", "math", "equation", "solve", "compute",
+                             "integral", "derivative", "percent", "%"})),
+    ("reasoning", frozenset({"research", "paper", "study", "academic", "arxiv",
+                             "pubmed", "literature", "latest research", "find papers"})),
+    ("analysis",  frozenset({"analyze", "analysis", "compare", "evaluate",
+                             "review", "assess", "critique"})),
+    ("coding",    frozenset({"code", "programming", "python", "javascript",
+                             "function", "debug", "implement", "algorithm"})),
+    ("creative",  frozenset({"write", "story", "poem", "creative",
+                             "imagine", "generate text", "essay"})),
+)
+
+# One alternation pattern with a named group per task. Compiled once at import,
+# so classification is a single C-level scan instead of up to 40 Python-level
+# substring searches per message. IGNORECASE pushes case folding into the
+# regex engine, removing the per-call str.lower() copy of the message.
+# Keywords are sorted longest-first within each group for determinism.
+_TASK_PATTERN = re.compile(
+    "|".join(
+        f"(?P<{task}>"
+        + "|".join(re.escape(kw) for kw in sorted(kws, key=lambda k: (-len(k), k)))
+        + ")"
+        for task, kws in _TASK_KEYWORDS
+    ),
+    re.IGNORECASE,
+)
+_TASK_PRIORITY = {task: rank for rank, (task, _) in enumerate(_TASK_KEYWORDS)}
+
+
 def get_task_optimized_llm(llm_manager: EnhancedLLM, user_message: str):
     """
     Keyword-based task classifier. Maps the user message to a task type and
     returns an LLM with the appropriate temperature.
 
     Simple keyword matching is intentional — an LLM-based classifier would add
-    a full inference round-trip just to route the request.
+    a full inference round-trip just to route the request. The keywords are
+    precompiled into a single alternation regex (_TASK_PATTERN) so the message
+    is scanned exactly once (case-insensitively, so the message is never
+    copied by .lower()); ties are broken by _TASK_PRIORITY so the result
+    matches the original category precedence, not textual match order.
     """
-    msg = user_message.lower()
-
-    if any(w in msg for w in ["calculate", "math", "equation", "solve", "compute",
-                               "integral", "derivative", "percent", "%"]):
-        return llm_manager.get_model_for_task("math")
-    elif any(w in msg for w in ["research", "paper", "study", "academic", "arxiv",
-                                 "pubmed", "literature", "latest research", "find papers"]):
-        return llm_manager.get_model_for_task("reasoning")
-    elif any(w in msg for w in ["analyze", "analysis", "compare", "evaluate",
-                                 "review", "assess", "critique"]):
-        return llm_manager.get_model_for_task("analysis")
-    elif any(w in msg for w in ["code", "programming", "python", "javascript",
-                                 "function", "debug", "implement", "algorithm"]):
-        return llm_manager.get_model_for_task("coding")
-    elif any(w in msg for w in ["write", "story", "poem", "creative",
-                                 "imagine", "generate text", "essay"]):
-        return llm_manager.get_model_for_task("creative")
-    else:
-        return llm_manager.get_model_for_task("general")
+    best = None
+    best_rank = len(_TASK_PRIORITY)
+    for match in _TASK_PATTERN.finditer(user_message):
+        rank = _TASK_PRIORITY[match.lastgroup]
+        if rank < best_rank:
+            best, best_rank = match.lastgroup, rank
+            if best_rank == 0:
+                break   # top-priority category hit — nothing can outrank it
+    return llm_manager.get_model_for_task(best or "general")
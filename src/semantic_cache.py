@@ -0,0 +1,109 @@
+"""
+src/semantic_cache.py
+=====================
+Semantic response cache for the Research Bot.
+
+Short-circuits the whole graph (LLM + tools) when a user asks something that
+is a near-duplicate of a question already answered in the same conversation
+thread. Queries are embedded with a small local sentence-transformer and
+compared by cosine similarity; a hit above the threshold returns the cached
+response without any network call.
+
+Entries are scoped per thread_id so one conversation's answers never leak
+into another user's session. The cache is process-local and in-memory —
+it deliberately does not persist, because cached answers can go stale
+(e.g. "latest papers on X") and a process restart is a natural expiry.
+
+Available only when sentence-transformers + numpy are installed (the same
+stack rag.py uses); callers should check SEMANTIC_CACHE_AVAILABLE first,
+mirroring the RAG_AVAILABLE pattern in tools.py.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# MiniLM rather than the mpnet model rag.py uses: queries are short, recall
+# requirements are loose (0.92 threshold), and MiniLM loads ~5x faster.
+CACHE_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SIMILARITY_THRESHOLD = 0.92
+MAX_ENTRIES_PER_THREAD = 64
+
+
+class SemanticResponseCache:
+    """
+    In-memory (embedding, response) store with cosine-similarity lookup.
+
+    The embedding model is loaded lazily on first use so importing this module
+    (and cold-starting the app) stays cheap when the cache is never hit.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._model: Optional["SentenceTransformer"] = None
+        # thread_id -> (embedding matrix [n, dim], parallel list of responses).
+        # Keeping embeddings stacked in one matrix lets lookup score every
+        # entry with a single BLAS matrix-vector product instead of a Python
+        # loop of per-entry dot products.
+        self._entries: Dict[str, Tuple["np.ndarray", List[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _embed(self, text: str) -> "np.ndarray":
+        if self._model is None:
+            logger.info("Loading semantic-cache embedding model %s", CACHE_MODEL)
+            self._model = SentenceTransformer(CACHE_MODEL)
+        return self._model.encode(text, normalize_embeddings=True)
+
+    def lookup(self, query: str, thread_id: str) -> Optional[str]:
+        """
+        Return the cached response for the most similar previous query in this
+        thread, or None when nothing clears the similarity threshold.
+        """
+        entry = self._entries.get(thread_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        matrix, responses = entry
+        vec = self._embed(query)
+        # Embeddings are normalized, so the matvec yields cosine similarities
+        # for every cached query at once — one BLAS call, no Python loop.
+        scores = matrix @ vec
+        best = int(np.argmax(scores))
+        if scores[best] >= self.threshold:
+            self.hits += 1
+            logger.info("Semantic cache hit (score=%.3f)", float(scores[best]))
+            return responses[best]
+
+        self.misses += 1
+        return None
+
+    def store(self, query: str, response: str, thread_id: str) -> None:
+        """Record a completed (query, response) pair for future lookups."""
+        if not response.strip():
+            return
+        vec = self._embed(query)
+        entry = self._entries.get(thread_id)
+        if entry is None:
+            self._entries[thread_id] = (vec[None, :], [response])
+            return
+        matrix, responses = entry
+        if len(responses) >= MAX_ENTRIES_PER_THREAD:
+            # Oldest-first eviction — stale answers are the least useful anyway
+            matrix = matrix[1:]
+            responses = responses[1:]
+        self._entries[thread_id] = (np.vstack([matrix, vec]), responses + [response])
+
+    def clear_thread(self, thread_id: str) -> None:
+        """Drop all cached responses for one conversation thread."""
+        self._entries.pop(thread_id, None)
@@ -24,16 +24,28 @@ Tool names as registered by LangChain (used in the system prompt):
   file_content_generator, semantic_scholar_search, openalex_search
 """
 
+import ast
+import operator
 import os
 import json
 import random
+import re
 import contextvars
 from datetime import datetime
+from functools import lru_cache
 from typing import List
 
 from dotenv import load_dotenv
 load_dotenv()
 
+# orjson serializes several times faster than stdlib json (C implementation,
+# no whitespace bikeshedding). Optional — everything falls back to json.
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from langchain_core.tools import tool
 from src.logger import get_logger
 
@@ -76,6 +88,54 @@ except ImportError:
 # Utility tools
 # ---------------------------------------------------------------------------
 
+# Operators the calculator accepts — arithmetic only, mirroring what eval()
+# could reach through the character whitelist. Anything else in the AST
+# (names, calls, attributes, subscripts) raises.
+_CALC_OPERATORS = {
+    ast.Add:      operator.add,
+    ast.Sub:      operator.sub,
+    ast.Mult:     operator.mul,
+    ast.Div:      operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow:      operator.pow,
+    ast.USub:     operator.neg,
+    ast.UAdd:     operator.pos,
+}
+
+
+def _eval_calc_node(node: ast.AST) -> float:
+    """Recursively evaluate a whitelisted arithmetic AST node."""
+    if isinstance(node, ast.Expression):
+        return _eval_calc_node(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _CALC_OPERATORS:
+        return _CALC_OPERATORS[type(node.op)](
+            _eval_calc_node(node.left), _eval_calc_node(node.right)
+        )
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _CALC_OPERATORS:
+        return _CALC_OPERATORS[type(node.op)](_eval_calc_node(node.operand))
+    raise ValueError(f"unsupported expression element: {type(node).__name__}")
+
+
+# Complement of the calculator's allowed character set — one C-level regex
+# scan replaces the per-character Python membership loop. Space is listed
+# explicitly (not \s) so tabs/newlines stay rejected, as before.
+_INVALID_CALC_CHAR = re.compile(r"[^0-9+\-*/.() ]")
+
+
+@lru_cache(maxsize=1024)
+def _evaluate_expression(expression: str) -> float:
+    """
+    Parse and evaluate an arithmetic expression via a restricted AST walk.
+
+    Stricter than eval() behind a character whitelist (only numeric constants
+    and arithmetic operators can appear in the tree) and cached on the exact
+    expression string, so repeated queries skip both parse and evaluation.
+    """
+    return _eval_calc_node(ast.parse(expression, mode="eval"))
+
+
 @tool
 def calculator(expression: str) -> str:
     """
@@ -87,23 +147,26 @@ def calculator(expression: str) -> str:
     Returns:
         Result of the calculation or an error message
     """
-    # Whitelist of allowed characters instead of ast.literal_eval or sandboxed exec.
-    # The LLM only sends simple arithmetic, so full expression parsing is unnecessary,
-    # and this approach keeps the attack surface minimal.
-    allowed_chars = set("0123456789+-*/.() ")
-    if not all(c in allowed_chars for c in expression):
+    # Fast character pre-check before parsing; the AST evaluator below is the
+    # real guard (only numeric constants and arithmetic operators can appear).
+    if _INVALID_CALC_CHAR.search(expression):
         return "Error: Invalid characters. Only numbers and basic operators (+, -, *, /, parentheses) are allowed."
 
     if "%" in expression:
         return "Error: Use decimal form instead of %. Example: '15/100 * 2500' instead of '15% * 2500'"
 
     try:
-        result = eval(expression)   # safe: input is constrained to the whitelist above
+        result = _evaluate_expression(expression)
         return f"Result: {result}"
     except Exception as e:
         return f"Error calculating '{expression}': {str(e)}"
 
 
+# Matches import statements at the start of any line (multiline mode), so the
+# import check is one regex scan instead of splitting and stripping every line.
+_IMPORT_LINE = re.compile(r"^\s*(?:import |from )", re.MULTILINE)
+
+
 @tool
 def code_analyzer(code: str, language: str = "python") -> str:
     """
@@ -117,13 +180,20 @@ def code_analyzer(code: str, language: str = "python") -> str:
         Analysis report as a formatted string
     """
     try:
+        # Count newlines instead of materializing a line list; the snippet is
+        # scanned once per metric with no intermediate allocations. A trailing
+        # newline doesn't start a new line — matches len(code.splitlines()).
+        line_count = (
+            code.count("\n") + (0 if code.endswith("\n") else 1) if code else 0
+        )
+        is_python = language == "python"
         feedback = (
             f"Code Analysis for {language}:\n"
-            f"- Lines of code: {len(code.splitlines())}\n"
+            f"- Lines of code: {line_count}\n"
             f"- Characters: {len(code)}\n"
-            f"- Contains functions: {'def ' in code if language == 'python' else 'function ' in code}\n"
-            f"- Contains classes: {'class ' in code if language == 'python' else False}\n"
-            f"- Contains imports: {any(l.strip().startswith(('import ', 'from ')) for l in code.splitlines()) if language == 'python' else False}"
+            f"- Contains functions: {'def ' in code if is_python else 'function ' in code}\n"
+            f"- Contains classes: {'class ' in code if is_python else False}\n"
+            f"- Contains imports: {bool(_IMPORT_LINE.search(code)) if is_python else False}"
         )
 
         if language == "python":
@@ -139,6 +209,13 @@ def code_analyzer(code: str, language: str = "python") -> str:
         return f"Error analyzing code: {str(e)}"
 
 
+# Hoisted out of weather_info: the conditions tuple was rebuilt per call, and
+# a dedicated Random instance skips the lock-protected module-global twister
+# shared with every other random user in the process.
+_WEATHER_CONDITIONS = ("sunny", "cloudy", "rainy", "partly cloudy", "windy")
+_WEATHER_RNG = random.Random()
+
+
 @tool
 def weather_info(location: str) -> str:
     """
@@ -153,17 +230,54 @@ def weather_info(location: str) -> str:
     Returns:
         Weather report string (currently demo/simulated data)
     """
-    conditions = ["sunny", "cloudy", "rainy", "partly cloudy", "windy"]
     return (
         f"Weather for {location} (Demo Data):\n"
-        f"- Temperature: {random.randint(15, 35)}C\n"
-        f"- Condition: {random.choice(conditions).title()}\n"
-        f"- Humidity: {random.randint(40, 80)}%\n"
-        f"- Wind Speed: {random.randint(5, 25)} km/h\n"
+        f"- Temperature: {_WEATHER_RNG.randint(15, 35)}C\n"
+        f"- Condition: {_WEATHER_RNG.choice(_WEATHER_CONDITIONS).title()}\n"
+        f"- Humidity: {_WEATHER_RNG.randint(40, 80)}%\n"
+        f"- Wind Speed: {_WEATHER_RNG.randint(5, 25)} km/h\n"
         "Note: This is simulated data for demonstration purposes."
     )
 
 
+def _dumps_pretty(obj) -> str:
+    """Indented JSON via orjson when installed, stdlib json otherwise."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2)
+
+
+# Static file templates, built once at import. Only the description varies per
+# call, so the bodies are .format()ed instead of reassembled from f-string
+# fragments on every invocation. Literal braces in code samples are doubled.
+_CSV_TEMPLATE = (
+    "# Sample CSV for: {description}\n"
+    "name,age,city,score\n"
+    "Alice,25,New York,85\n"
+    "Bob,30,London,92\n"
+    "Charlie,35,Tokyo,78\n"
+    "Diana,28,Paris,88"
+)
+
+_PYTHON_TEMPLATE = (
+    '"""{description}"""\n\n'
+    "def main():\n"
+    "    data = [1, 2, 3, 4, 5]\n"
+    "    print(f'Result: {{process_data(data)}}')\n\n"
+    "def process_data(data):\n"
+    "    return sum(data)\n\n"
+    'if __name__ == "__main__":\n'
+    "    main()\n"
+)
+
+_MARKDOWN_TEMPLATE = (
+    "# {description}\n\n"
+    "## Overview\nThis document covers {description_lower}.\n\n"
+    "## Key Points\n- Point 1\n- Point 2\n- Point 3\n\n"
+    "## Code Example\n```python\ndef example():\n    return 'Hello'\n```\n"
+)
+
+
 @tool
 def file_content_generator(file_type: str, content_description: str) -> str:
     """
@@ -178,16 +292,9 @@ def file_content_generator(file_type: str, content_description: str) -> str:
     """
     try:
         if file_type.lower() == "csv":
-            return (
-                f"# Sample CSV for: {content_description}\n"
-                "name,age,city,score\n"
-                "Alice,25,New York,85\n"
-                "Bob,30,London,92\n"
-                "Charlie,35,Tokyo,78\n"
-                "Diana,28,Paris,88"
-            )
+            return _CSV_TEMPLATE.format(description=content_description)
         elif file_type.lower() == "json":
-            return json.dumps({
+            return _dumps_pretty({
                 "description": content_description,
                 "data": [
                     {"id": 1, "name": "Item 1", "value": 100},
@@ -195,24 +302,13 @@ def file_content_generator(file_type: str, content_description: str) -> str:
                     {"id": 3, "name": "Item 3", "value": 175},
                 ],
                 "metadata": {"created": datetime.now().isoformat(), "version": "1.0"},
-            }, indent=2)
+            })
         elif file_type.lower() == "python":
-            return (
-                f'"""{content_description}"""\n\n'
-                "def main():\n"
-                "    data = [1, 2, 3, 4, 5]\n"
-                "    print(f'Result: {process_data(data)}')\n\n"
-                "def process_data(data):\n"
-                "    return sum(data)\n\n"
-                'if __name__ == "__main__":\n'
-                "    main()\n"
-            )
+            return _PYTHON_TEMPLATE.format(description=content_description)
         elif file_type.lower() == "markdown":
-            return (
-                f"# {content_description}\n\n"
-                f"## Overview\nThis document covers {content_description.lower()}.\n\n"
-                "## Key Points\n- Point 1\n- Point 2\n- Point 3\n\n"
-                "## Code Example\n```python\ndef example():\n    return 'Hello'\n```\n"
+            return _MARKDOWN_TEMPLATE.format(
+                description=content_description,
+                description_lower=content_description.lower(),
             )
         else:
             return f"Sample content for {file_type}:\n{content_description}\n\nGenerated: {datetime.now()}"
@@ -507,10 +603,20 @@ def find_related_papers(topic: str) -> str:
 # Tool factory
 # ---------------------------------------------------------------------------
 
+# Populated on the first initialize_tools() call and reused afterwards.
+# Building the list constructs API wrappers and logs availability checks;
+# none of that depends on per-call inputs, so one pass per process is enough.
+_tools_cache: List = []
+
+
 def initialize_tools() -> List:
     """
     Instantiates and returns all tools in the order they are added to the list.
 
+    Memoized: the list is built once per process and the same tool objects are
+    returned on every subsequent call (app.py additionally caches via
+    st.cache_resource, but direct callers get the same guarantee here).
+
     Always available (no API key):
       arxiv, wikipedia, pub_med, duckduckgo_search,
       calculator, code_analyzer, weather_info, file_content_generator,
@@ -531,6 +637,9 @@ def initialize_tools() -> List:
     -------
     List of LangChain tool objects, ready to pass to llm.bind_tools() and ToolNode()
     """
+    if _tools_cache:
+        return _tools_cache
+
     # Wikipedia returns long full-article text; limit results to avoid overflowing context
     wiki_tool = WikipediaQueryRun(
         api_wrapper=WikipediaAPIWrapper(top_k_results=2, doc_content_chars_max=800),
@@ -599,4 +708,5 @@ def initialize_tools() -> List:
         logger.warning("PDF search not available (install chromadb + sentence-transformers)")
 
     logger.info("Initialized %d tools successfully", len(tools_list))
-    return tools_list
+    _tools_cache.extend(tools_list)
+    return _tools_cache